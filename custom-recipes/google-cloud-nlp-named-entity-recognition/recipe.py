@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
+import logging
 from typing import Dict, AnyStr
-from ratelimit import limits, RateLimitException
+import pandas as pd
 from retry import retry
 from google.cloud import language
 from google.protobuf.json_format import MessageToJson
@@ -8,10 +9,12 @@ from google.protobuf.json_format import MessageToJson
 import dataiku
 from dataiku.customrecipe import get_recipe_config, get_input_names_for_role, get_output_names_for_role
 
-from google_nlp_api_client import DOCUMENT_TYPE, ENCODING_TYPE, API_EXCEPTIONS, get_client
+from google_nlp_api_client import DOCUMENT_TYPE, ENCODING_TYPE, API_EXCEPTIONS, API_RETRY_EXCEPTIONS, get_client
 from plugin_io_utils import ErrorHandlingEnum, validate_column_input
-from dku_io_utils import set_column_description
+from dku_io_utils import set_column_description, process_dataset_chunks
 from api_parallelizer import api_parallelizer
+from api_rate_limiter import TokenBucketRateLimiter
+from api_response_cache import APIResponseCache
 from google_nlp_api_formatting import EntityTypeEnum, NamedEntityRecognitionAPIFormatter
 
 
@@ -19,19 +22,24 @@ from google_nlp_api_formatting import EntityTypeEnum, NamedEntityRecognitionAPIF
 # SETUP
 # ==============================================================================
 
-api_configuration_preset = get_recipe_config().get("api_configuration_preset")
+recipe_config = get_recipe_config()
+api_configuration_preset = recipe_config.get("api_configuration_preset")
 if api_configuration_preset is None or api_configuration_preset == {}:
     raise ValueError("Please specify an API configuration preset")
 service_account_key = api_configuration_preset.get("gcp_service_account_key")
 api_quota_rate_limit = api_configuration_preset.get("api_quota_rate_limit")
 api_quota_period = api_configuration_preset.get("api_quota_period")
 parallel_workers = api_configuration_preset.get("parallel_workers")
-text_column = get_recipe_config().get("text_column")
-text_language = get_recipe_config().get("language", "").replace("auto", "")
-entity_sentiment = get_recipe_config().get("entity_sentiment", False)
-error_handling = ErrorHandlingEnum[get_recipe_config().get("error_handling")]
-entity_types = [EntityTypeEnum[i] for i in get_recipe_config().get("entity_types", [])]
-minimum_score = float(get_recipe_config().get("minimum_score", 0))
+cache_dir = api_configuration_preset.get("cache_dir")
+text_column = recipe_config.get("text_column")
+text_language = recipe_config.get("language", "").replace("auto", "")
+entity_sentiment = recipe_config.get("entity_sentiment", False)
+error_handling = ErrorHandlingEnum[recipe_config.get("error_handling")]
+max_text_length = int(recipe_config.get("max_text_length", 0))
+if max_text_length < 0:
+    raise ValueError("Maximum text length must be positive")
+entity_types = [EntityTypeEnum[i] for i in recipe_config.get("entity_types", [])]
+minimum_score = float(recipe_config.get("minimum_score", 0))
 if minimum_score < 0 or minimum_score > 1:
     raise ValueError("Minimum salience score must be between 0 and 1")
 input_dataset_name = get_input_names_for_role("input_dataset")[0]
@@ -43,8 +51,9 @@ output_dataset_name = get_output_names_for_role("output_dataset")[0]
 output_dataset = dataiku.Dataset(output_dataset_name)
 
 validate_column_input(text_column, input_columns_names)
-input_df = input_dataset.get_dataframe()
 client = get_client(service_account_key)
+api_cache = APIResponseCache(cache_dir)
+rate_limiter = TokenBucketRateLimiter(calls=api_quota_rate_limit, period=api_quota_period)
 column_prefix = "entity_api"
 
 
@@ -53,8 +62,17 @@ column_prefix = "entity_api"
 # ==============================================================================
 
 
-@retry((RateLimitException, OSError), delay=api_quota_period, tries=5)
-@limits(calls=api_quota_rate_limit, period=api_quota_period)
+@retry(API_RETRY_EXCEPTIONS, delay=1, backoff=2, max_delay=api_quota_period, tries=5)
+@rate_limiter.limit
+def analyze_entities(text: AnyStr, text_language: AnyStr, entity_sentiment: bool) -> AnyStr:
+    document = language.types.Document(content=text, language=text_language, type=DOCUMENT_TYPE)
+    if entity_sentiment:
+        response = client.analyze_entity_sentiment(document=document, encoding_type=ENCODING_TYPE)
+    else:
+        response = client.analyze_entities(document=document, encoding_type=ENCODING_TYPE)
+    return MessageToJson(response, including_default_value_fields=True)
+
+
 def call_api_named_entity_recognition(
     row: Dict, text_column: AnyStr, text_language: AnyStr, entity_sentiment: bool
 ) -> AnyStr:
@@ -62,36 +80,42 @@ def call_api_named_entity_recognition(
     if not isinstance(text, str) or str(text).strip() == "":
         return ""
     else:
-        document = language.types.Document(content=text, language=text_language, type=DOCUMENT_TYPE)
-        if entity_sentiment:
-            response = client.analyze_entity_sentiment(document=document, encoding_type=ENCODING_TYPE)
-        else:
-            response = client.analyze_entities(document=document, encoding_type=ENCODING_TYPE)
-        return MessageToJson(response, including_default_value_fields=True)
-
-
-df = api_parallelizer(
-    input_df=input_df,
-    api_call_function=call_api_named_entity_recognition,
-    api_exceptions=API_EXCEPTIONS,
-    column_prefix=column_prefix,
-    parallel_workers=parallel_workers,
-    error_handling=error_handling,
-    text_column=text_column,
-    text_language=text_language,
-    entity_sentiment=entity_sentiment,
-)
+        if max_text_length != 0:
+            text = text[:max_text_length]
+        api_name = "analyze_entity_sentiment" if entity_sentiment else "analyze_entities"
+        cache_key = api_cache.compute_key(api_name, text_language, text)
+        return api_cache.get_or_compute(cache_key, lambda: analyze_entities(text, text_language, entity_sentiment))
+
 
 api_formatter = NamedEntityRecognitionAPIFormatter(
-    input_df=input_df,
+    input_df=pd.DataFrame(columns=input_columns_names),
     column_prefix=column_prefix,
     entity_types=entity_types,
     minimum_score=minimum_score,
     error_handling=error_handling,
 )
-output_df = api_formatter.format_df(df)
 
-output_dataset.write_with_schema(output_df)
+
+def process_chunk(input_df: pd.DataFrame) -> pd.DataFrame:
+    if max_text_length != 0:
+        num_truncated = sum([isinstance(t, str) and len(t) > max_text_length for t in input_df[text_column]])
+        logging.info("Truncating {} texts to {} characters".format(num_truncated, max_text_length))
+    df = api_parallelizer(
+        input_df=input_df,
+        api_call_function=call_api_named_entity_recognition,
+        api_exceptions=API_EXCEPTIONS,
+        column_prefix=column_prefix,
+        parallel_workers=parallel_workers,
+        error_handling=error_handling,
+        deduplicate_columns=[text_column],
+        text_column=text_column,
+        text_language=text_language,
+        entity_sentiment=entity_sentiment,
+    )
+    return api_formatter.format_df(df)
+
+
+process_dataset_chunks(input_dataset=input_dataset, output_dataset=output_dataset, func=process_chunk)
 set_column_description(
     input_dataset=input_dataset,
     output_dataset=output_dataset,
@@ -4,8 +4,10 @@
 import logging
 import inspect
 import math
+import threading
+from functools import partial
 from typing import Callable, AnyStr, List, Tuple, NamedTuple, Dict, Union
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 import pandas as pd
 from more_itertools import chunked, flatten
@@ -22,6 +24,12 @@ DEFAULT_PARALLEL_WORKERS = 4
 DEFAULT_BATCH_SIZE = 10
 DEFAULT_API_SUPPORT_BATCH = False
 DEFAULT_VERBOSE = False
+MAX_PENDING_FUTURES_PER_WORKER = 4
+
+_thread_pool = None
+_thread_pool_workers = None
+_thread_pool_lock = threading.Lock()
+_error_type_names = {}
 
 
 # ==============================================================================
@@ -29,6 +37,60 @@ DEFAULT_VERBOSE = False
 # ==============================================================================
 
 
+def get_thread_pool(parallel_workers: int = DEFAULT_PARALLEL_WORKERS) -> ThreadPoolExecutor:
+    """
+    Get a thread pool with the given number of workers, shared across calls of the "api_parallelizer" function,
+    so that threads are not created and destroyed for every chunk of a dataset.
+    The pool is recreated only if the number of workers changes.
+    """
+    global _thread_pool, _thread_pool_workers
+    with _thread_pool_lock:
+        if _thread_pool is None or _thread_pool_workers != parallel_workers:
+            if _thread_pool is not None:
+                _thread_pool.shutdown(wait=True)
+            _thread_pool = ThreadPoolExecutor(max_workers=parallel_workers)
+            _thread_pool_workers = parallel_workers
+        return _thread_pool
+
+
+def get_error_type(error: Exception) -> AnyStr:
+    """
+    Get the name of the exception class, prefixed by its module if it can be found.
+    Names are cached by exception class, as finding the module of builtin exceptions
+    scans all loaded modules, which is slow when many API calls fail at once.
+    """
+    error_class = type(error)
+    error_type = _error_type_names.get(error_class)
+    if error_type is None:
+        error_type = str(error_class.__qualname__)
+        module = inspect.getmodule(error)
+        if module is not None:
+            error_type = str(module.__name__) + "." + error_type
+        _error_type_names[error_class] = error_type
+    return error_type
+
+
+def group_duplicate_rows(df: pd.DataFrame, columns: List[AnyStr]) -> Tuple[List[int], List[int]]:
+    """
+    Assign the same group to rows with the same values in the given columns, all missing values being equal.
+    Return the group of each row, and the position of the first row of each group.
+    """
+    column_codes = []
+    for col in columns:
+        codes, uniques = pd.factorize(df[col])
+        codes[codes == -1] = len(uniques)  # Missing values are coded -1 by factorize
+        column_codes.append(codes.tolist())
+    group_ids = {}
+    group_first_positions = []
+    row_group_ids = []
+    for i, key in enumerate(zip(*column_codes)):
+        group_id = group_ids.setdefault(key, len(group_ids))
+        if group_id == len(group_first_positions):
+            group_first_positions.append(i)
+        row_group_ids.append(group_id)
+    return row_group_ids, group_first_positions
+
+
 def api_call_single_row(
     api_call_function: Callable,
     api_column_names: NamedTuple,
@@ -58,11 +120,8 @@ def api_call_single_row(
             response = api_call_function(row=row, **api_call_function_kwargs)
             row[api_column_names.response] = response
         except api_exceptions as e:
-            logging.warning(str(e))
-            error_type = str(type(e).__qualname__)
-            module = inspect.getmodule(e)
-            if module is not None:
-                error_type = str(module.__name__) + "." + error_type
+            logging.warning("%s", e)
+            error_type = get_error_type(e)
             row[api_column_names.error_message] = str(e)
             row[api_column_names.error_type] = error_type
             row[api_column_names.error_raw] = str(e.args)
@@ -100,11 +159,8 @@ def api_call_batch(
             response = api_call_function(batch=batch, **api_call_function_kwargs)
             batch = batch_api_response_parser(batch=batch, response=response, api_column_names=api_column_names)
         except api_exceptions as e:
-            logging.warning(str(e))
-            error_type = str(type(e).__qualname__)
-            module = inspect.getmodule(e)
-            if module is not None:
-                error_type = str(module.__name__) + "." + error_type
+            logging.warning("%s", e)
+            error_type = get_error_type(e)
             for row in batch:
                 row[api_column_names.response] = ""
                 row[api_column_names.error_message] = str(e)
@@ -122,8 +178,9 @@ def convert_api_results_to_df(
 ) -> pd.DataFrame:
     """
     Helper function to the "api_parallelizer" main function.
-    Combine API results (list of dict) with input dataframe,
-    and convert it to a dataframe.
+    Combine API results (list of dict, in the same order as the input dataframe rows)
+    with input dataframe, and convert it to a dataframe.
+    Only API columns are built from the results, input columns are concatenated as is.
     """
     if error_handling == ErrorHandlingEnum.FAIL:
         columns_to_exclude = [v for k, v in api_column_names._asdict().items() if "error" in k]
@@ -131,12 +188,13 @@ def convert_api_results_to_df(
         columns_to_exclude = []
         if not verbose:
             columns_to_exclude = [api_column_names.error_raw]
-    output_schema = {**{v: str for v in api_column_names}, **dict(input_df.dtypes)}
-    output_schema = {k: v for k, v in output_schema.items() if k not in columns_to_exclude}
-    record_list = [{col: result.get(col) for col in output_schema.keys()} for result in api_results]
     api_column_list = [c for c in api_column_names if c not in columns_to_exclude]
-    output_column_list = list(input_df.columns) + api_column_list
-    output_df = pd.DataFrame.from_records(record_list).astype(output_schema).reindex(columns=output_column_list)
+    api_df = pd.DataFrame(
+        {col: [result.get(col) for result in api_results] for col in api_column_list},
+        index=input_df.index,
+        columns=api_column_list,
+    ).astype(str)
+    output_df = pd.concat([input_df, api_df], axis=1)
     assert len(output_df.index) == len(input_df.index)
     return output_df
 
@@ -151,6 +209,7 @@ def api_parallelizer(
     batch_size: int = DEFAULT_BATCH_SIZE,
     error_handling: ErrorHandlingEnum = ErrorHandlingEnum.LOG,
     verbose: bool = DEFAULT_VERBOSE,
+    deduplicate_columns: List[AnyStr] = None,
     **api_call_function_kwargs
 ) -> pd.DataFrame:
     """
@@ -159,9 +218,27 @@ def api_parallelizer(
     Parallelism works by:
     - (default) sending multiple concurrent threads
     - if the API supports it, sending batches of row
+    If deduplicate_columns are specified, the API is called only once per unique combination
+    of values in these columns (all missing values being equal), and results are mapped back to all rows
+    by position. The function should then only read these columns from its 'row' parameter.
+    Duplicates are only detected within the input dataframe, so within each chunk of a dataset.
     """
-    df_iterator = (i[1].to_dict() for i in input_df.iterrows())
-    len_iterator = len(input_df.index)
+    item_parameter = "batch" if api_support_batch else "row"
+    if item_parameter not in inspect.signature(api_call_function).parameters:
+        raise ValueError(
+            "API call function '{}' must have a '{}' parameter".format(api_call_function.__name__, item_parameter)
+        )
+    api_input_df = input_df
+    if deduplicate_columns:
+        row_group_ids, group_first_positions = group_duplicate_rows(input_df, deduplicate_columns)
+        api_input_df = input_df[deduplicate_columns].iloc[group_first_positions]
+        logging.info(
+            "Deduplicating {} input rows to {} unique rows on {}".format(
+                len(input_df.index), len(api_input_df.index), deduplicate_columns
+            )
+        )
+    df_iterator = api_input_df.to_dict(orient="records")
+    len_iterator = len(api_input_df.index)
     log_msg = "Calling remote API endpoint with {} rows...".format(len_iterator)
     if api_support_batch:
         log_msg += ", chunked by {}".format(batch_size)
@@ -180,16 +257,34 @@ def api_parallelizer(
         pool_kwargs[k] = locals()[k]
     for k in ["fn", "row", "batch"]:  # Reserved pool keyword arguments
         pool_kwargs.pop(k, None)
-    api_results = []
-    with ThreadPoolExecutor(max_workers=parallel_workers) as pool:
-        if api_support_batch:
-            futures = [pool.submit(api_call_batch, batch=batch, **pool_kwargs) for batch in df_iterator]
-        else:
-            futures = [pool.submit(api_call_single_row, row=row, **pool_kwargs) for row in df_iterator]
-        for f in tqdm_auto(as_completed(futures), total=len_iterator):
-            api_results.append(f.result())
+    api_call_wrapper = partial(api_call_batch if api_support_batch else api_call_single_row, **pool_kwargs)
+    api_results = [None] * len_iterator
+    max_pending_futures = parallel_workers * MAX_PENDING_FUTURES_PER_WORKER
+    pool = get_thread_pool(parallel_workers)
+    futures = {}  # Pending futures mapped to their position in the input
+    with tqdm_auto(total=len_iterator, mininterval=0.5, miniters=max(1, len_iterator // 1000)) as progress_bar:
+        try:
+            for i, item in enumerate(df_iterator):
+                if len(futures) >= max_pending_futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        api_results[futures.pop(f)] = f.result()
+                        progress_bar.update(1)
+                if api_support_batch:
+                    futures[pool.submit(api_call_wrapper, batch=item)] = i
+                else:
+                    futures[pool.submit(api_call_wrapper, row=item)] = i
+            for f in as_completed(futures):
+                api_results[futures[f]] = f.result()
+                progress_bar.update(1)
+        except BaseException:
+            for f in futures:  # Do not leave pending API calls in the shared thread pool
+                f.cancel()
+            raise
     if api_support_batch:
-        api_results = flatten(api_results)
+        api_results = list(flatten(api_results))
+    if deduplicate_columns:
+        api_results = [api_results[group_id] for group_id in row_group_ids]
     output_df = convert_api_results_to_df(input_df, api_results, api_column_names, error_handling, verbose)
     num_api_error = sum(output_df[api_column_names.response] == "")
     num_api_success = len(input_df.index) - num_api_error
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Module with a thread-safe rate limiter to stay within API quotas"""
+
+import time
+import threading
+from functools import wraps
+from typing import Callable
+
+
+# ==============================================================================
+# CLASS AND FUNCTION DEFINITION
+# ==============================================================================
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket rate limiter allowing a maximum number of calls per period, shared across threads:
+    - the bucket refills continuously at a rate of calls / period tokens per second
+    - each call consumes one token, or waits just long enough for the next token to be available
+    - the bucket capacity sets the maximum burst of calls (default to 1 to spread calls evenly)
+    Waiting threads sleep outside of the lock, so that other threads are never blocked by a sleeping one.
+    """
+
+    def __init__(self, calls: int, period: float, capacity: int = 1):
+        if calls <= 0 or period <= 0 or capacity <= 0:
+            raise ValueError("Rate limit calls, period and capacity must be positive")
+        self.refill_rate = float(calls) / float(period)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._last_refill_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Consume one token, waiting for the bucket to refill if it is empty
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed_time = now - self._last_refill_time
+                self._tokens = min(self.capacity, self._tokens + elapsed_time * self.refill_rate)
+                self._last_refill_time = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.refill_rate
+            time.sleep(wait_time)
+
+    def limit(self, function: Callable) -> Callable:
+        """
+        Decorator to acquire a token before each call of the decorated function
+        """
+
+        @wraps(function)
+        def wrapped(*args, **kwargs):
+            self.acquire()
+            return function(*args, **kwargs)
+
+        return wrapped
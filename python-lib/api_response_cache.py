@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Module with a persistent cache to avoid calling the API twice on the same input"""
+
+import logging
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import AnyStr, Callable
+
+
+# ==============================================================================
+# CONSTANT DEFINITION
+# ==============================================================================
+
+CACHE_FILE_NAME = "api_response_cache.sqlite"
+DEFAULT_CACHE_MAX_ENTRIES = 100000
+CACHE_EVICTION_INTERVAL = 1000  # Number of insertions between two evictions of least recently used entries
+CACHE_LOCK_TIMEOUT = 60  # Seconds to wait for other processes sharing the cache file to release their lock
+
+
+# ==============================================================================
+# CLASS AND FUNCTION DEFINITION
+# ==============================================================================
+
+
+class APIResponseCache:
+    """
+    Persistent least recently used (LRU) cache of API responses stored in a SQLite file:
+    - keyed by a SHA-256 hash of the API name, language and text
+    - capped to a maximum number of entries, evicting the least recently accessed ones
+    - safe to share across threads calling the API in parallel, and across recipes using the same file
+    - errors when reading or writing the cache are logged and treated as cache misses
+    - does nothing if no cache directory is specified
+    """
+
+    def __init__(self, cache_dir: AnyStr = None, max_entries: int = DEFAULT_CACHE_MAX_ENTRIES):
+        self.enabled = cache_dir is not None and cache_dir.strip() != ""
+        self.max_entries = int(max_entries)
+        if self.max_entries <= 0:
+            raise ValueError("Maximum number of cache entries must be positive")
+        self._lock = threading.Lock()
+        self._connection = None
+        self._num_insertions = 0
+        if self.enabled:
+            cache_path = os.path.join(cache_dir, CACHE_FILE_NAME)
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                self._connection = sqlite3.connect(
+                    cache_path, timeout=CACHE_LOCK_TIMEOUT, check_same_thread=False, isolation_level=None
+                )
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS api_response (key TEXT PRIMARY KEY, response TEXT, accessed_at REAL)"
+                )
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS api_response_accessed_at ON api_response (accessed_at)"
+                )
+                self._evict()
+            except (OSError, sqlite3.Error) as e:
+                raise ValueError(
+                    "Cannot use API response cache directory '{}', please check it is a writable local path: {}".format(
+                        cache_dir, e
+                    )
+                )
+            logging.info("API response cache loaded from {}".format(cache_path))
+
+    @staticmethod
+    def compute_key(api_name: AnyStr, text_language: AnyStr, text: AnyStr) -> AnyStr:
+        return hashlib.sha256("|".join([api_name, text_language, text]).encode("utf-8")).hexdigest()
+
+    def _evict(self) -> None:
+        """
+        Delete the least recently accessed entries beyond the maximum number of entries
+        """
+        self._connection.execute(
+            "DELETE FROM api_response WHERE key IN "
+            + "(SELECT key FROM api_response ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def get(self, key: AnyStr) -> AnyStr:
+        with self._lock:
+            result = self._connection.execute("SELECT response FROM api_response WHERE key = ?", (key,)).fetchone()
+            if result is not None:
+                self._connection.execute("UPDATE api_response SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return result[0] if result is not None else None
+
+    def set(self, key: AnyStr, response: AnyStr) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO api_response VALUES (?, ?, ?)", (key, response, time.time())
+            )
+            self._num_insertions += 1
+            if self._num_insertions % CACHE_EVICTION_INTERVAL == 0:
+                self._evict()
+
+    def get_or_compute(self, key: AnyStr, compute_function: Callable) -> AnyStr:
+        """
+        Return the cached response for a key if it exists,
+        otherwise call the function and cache its response.
+        """
+        if not self.enabled:
+            return compute_function()
+        try:
+            response = self.get(key)
+        except sqlite3.Error as e:
+            logging.warning("Cannot read from API response cache, calling the API: %s", e)
+            response = None
+        if response is None:
+            response = compute_function()
+            try:
+                self.set(key, response)
+            except sqlite3.Error as e:
+                logging.warning("Cannot write to API response cache: %s", e)
+        return response
@@ -1,16 +1,91 @@
 # -*- coding: utf-8 -*-
 """Module with read/write utility functions based on the Dataiku API"""
 
-from typing import Dict
+import logging
+from typing import Callable, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
 
 import dataiku
 
 
+# ==============================================================================
+# CONSTANT DEFINITION
+# ==============================================================================
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Nullable pandas dtypes of DSS schema types which pandas may infer differently from one chunk to another
+SCHEMA_TYPE_TO_PANDAS_DTYPE = {
+    "tinyint": "Int64",
+    "smallint": "Int64",
+    "int": "Int64",
+    "bigint": "Int64",
+    "float": "float64",
+    "double": "float64",
+}
+if hasattr(pd, "BooleanDtype"):  # Nullable boolean dtype is only available from pandas 1.0
+    SCHEMA_TYPE_TO_PANDAS_DTYPE["boolean"] = "boolean"
+
+
 # ==============================================================================
 # CLASS AND FUNCTION DEFINITION
 # ==============================================================================
 
 
+def cast_dataframe_to_schema(df: pd.DataFrame, schema: List[Dict]) -> pd.DataFrame:
+    """
+    Cast columns of a dataframe inferred by pandas to the nullable dtype of their type in a DSS schema,
+    so that all chunks of a dataset get the same dtypes, whether or not they contain missing values.
+    Columns which cannot be cast are left as inferred.
+    """
+    for col in schema:
+        col_name = col.get("name")
+        dtype = SCHEMA_TYPE_TO_PANDAS_DTYPE.get(col.get("type"))
+        if dtype is not None and col_name in df.columns and df[col_name].dtype != dtype:
+            try:
+                df[col_name] = df[col_name].astype(dtype)
+            except (ValueError, TypeError) as e:
+                logging.warning("Cannot cast column '%s' to %s: %s", col_name, dtype, e)
+    return df
+
+
+def process_dataset_chunks(
+    input_dataset: dataiku.Dataset,
+    output_dataset: dataiku.Dataset,
+    func: Callable,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+    **kwargs
+) -> None:
+    """
+    Read a dataset by chunks, process each dataframe chunk with a function and write it to another dataset.
+    At most two chunks are held in memory, and API calls start as soon as the first chunk is read.
+    Each processed chunk is written in a background thread while the next chunk is processed.
+    The output schema is written once before reading any chunk: input columns keep their types from the
+    input schema, and new columns get the types of the function's output on an empty dataframe.
+    Types inferred by pandas on each chunk are cast to the input schema, so that every chunk matches the output schema.
+    """
+    input_schema = input_dataset.read_schema()
+    empty_input_df = cast_dataframe_to_schema(pd.DataFrame(columns=[col["name"] for col in input_schema]), input_schema)
+    empty_output_df = func(input_df=empty_input_df, **kwargs)
+    output_dataset.write_schema_from_dataframe(empty_output_df)
+    input_schema_dict = {col["name"]: col for col in input_schema}
+    output_schema = [input_schema_dict.get(col["name"], col) for col in output_dataset.read_schema()]
+    output_dataset.write_schema(output_schema)
+    with output_dataset.get_writer() as writer, ThreadPoolExecutor(max_workers=1) as write_pool:
+        write_future = None
+        for i, input_df in enumerate(input_dataset.iter_dataframes(chunksize=chunksize, infer_with_pandas=True)):
+            logging.info("Processing chunk {} of {} rows...".format(i + 1, len(input_df.index)))
+            input_df = cast_dataframe_to_schema(input_df, input_schema)
+            output_df = func(input_df=input_df, **kwargs)
+            if write_future is not None:
+                write_future.result()
+            write_future = write_pool.submit(writer.write_dataframe, output_df)
+        if write_future is not None:
+            write_future.result()
+
+
 def set_column_description(
     output_dataset: dataiku.Dataset, column_description_dict: Dict, input_dataset: dataiku.Dataset = None,
 ) -> None:
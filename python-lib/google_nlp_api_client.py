@@ -3,9 +3,12 @@
 
 import logging
 import json
+from functools import lru_cache
 
+import grpc
 from google.cloud import language
-from google.api_core.exceptions import GoogleAPICallError, RetryError
+from google.cloud.language_v1.gapic.transports.language_service_grpc_transport import LanguageServiceGrpcTransport
+from google.api_core.exceptions import GoogleAPICallError, RetryError, ResourceExhausted
 from google.oauth2 import service_account
 
 
@@ -17,6 +20,12 @@ DOCUMENT_TYPE = language.enums.Document.Type.PLAIN_TEXT
 ENCODING_TYPE = language.enums.EncodingType.UTF8
 
 API_EXCEPTIONS = (GoogleAPICallError, RetryError)
+# Transient errors worth retrying on top of the client's own retry policy,
+# which already retries calls on deadline exceeded and unavailable service errors
+API_RETRY_EXCEPTIONS = (OSError, ResourceExhausted)
+
+GRPC_CHANNEL_OPTIONS = [("grpc.keepalive_time_ms", 30000), ("grpc.keepalive_timeout_ms", 10000)]
+GRPC_CHANNEL_COMPRESSION = grpc.Compression.Gzip
 
 
 # ==============================================================================
@@ -24,18 +33,24 @@ API_EXCEPTIONS = (GoogleAPICallError, RetryError)
 # ==============================================================================
 
 
+@lru_cache(maxsize=8)
 def get_client(gcp_service_account_key=None):
     """
     Get a Google Natural Language API client from the service account key.
+    Clients are cached by key, so that credentials and channel are reused within the same process.
+    The gRPC channel compresses requests, as texts compress well, and is kept alive between bursts of calls.
     """
-    if gcp_service_account_key is None or gcp_service_account_key == "":
-        return language.LanguageServiceClient()
-    try:
-        credentials = json.loads(gcp_service_account_key)
-    except (ValueError, TypeError) as e:
-        logging.error(e)
-        raise ValueError("GCP service account key is not valid JSON")
-    credentials = service_account.Credentials.from_service_account_info(credentials)
-    logging.info("Credentials loaded")
-    client = language.LanguageServiceClient(credentials=credentials)
+    credentials = None
+    if gcp_service_account_key is not None and gcp_service_account_key != "":
+        try:
+            credentials = json.loads(gcp_service_account_key)
+        except (ValueError, TypeError) as e:
+            logging.error(e)
+            raise ValueError("GCP service account key is not valid JSON")
+        credentials = service_account.Credentials.from_service_account_info(credentials)
+        logging.info("Credentials loaded")
+    channel = LanguageServiceGrpcTransport.create_channel(
+        credentials=credentials, options=GRPC_CHANNEL_OPTIONS, compression=GRPC_CHANNEL_COMPRESSION
+    )
+    client = language.LanguageServiceClient(transport=LanguageServiceGrpcTransport(channel=channel))
     return client
@@ -2,10 +2,11 @@
 """Module with classes to format results from the Google NLP API"""
 
 import logging
+import numpy as np
 import pandas as pd
 
 from enum import Enum
-from typing import AnyStr, Dict, List, Union
+from typing import AnyStr, Dict, List
 
 from plugin_io_utils import (
     API_COLUMN_NAMES_DESCRIPTION_DICT,
@@ -38,6 +39,22 @@ class EntityTypeEnum(Enum):
     WORK_OF_ART = "Work of art"
 
 
+# The API returns sentiment scores as single-precision floats
+SENTIMENT_SCORE_DTYPE = np.float32
+
+# Score thresholds and labels of each categorical sentiment scale.
+# A score equal to a threshold falls into the upper label, except for the "ternary" scale
+# where a score of exactly 0.33 is still "neutral", hence the upper threshold nudged above 0.33.
+SENTIMENT_SCALE_THRESHOLDS = {
+    "binary": ([0.0], ["negative", "positive"]),
+    "ternary": ([-0.33, float(np.nextafter(0.33, 1.0))], ["negative", "neutral", "positive"]),
+    "quinary": (
+        [-0.66, -0.33, 0.33, 0.66],
+        ["highly negative", "negative", "neutral", "positive", "highly positive"],
+    ),
+}
+
+
 # ==============================================================================
 # CLASS AND FUNCTION DEFINITION
 # ==============================================================================
@@ -48,7 +65,7 @@ class GenericAPIFormatter:
     Geric Formatter class for API responses:
     - initialize with generic parameters
     - compute generic column descriptions
-    - apply format_row to dataframe
+    - parse all responses once and apply format_responses to dataframe
     """
 
     def __init__(
@@ -65,12 +82,13 @@ class GenericAPIFormatter:
             v: API_COLUMN_NAMES_DESCRIPTION_DICT[k] for k, v in self.api_column_names._asdict().items()
         }
 
-    def format_row(self, row: Dict) -> Dict:
-        return row
+    def format_responses(self, df: pd.DataFrame, responses: List[Dict]) -> pd.DataFrame:
+        return df
 
     def format_df(self, df: pd.DataFrame) -> pd.DataFrame:
         logging.info("Formatting API results...")
-        df = df.apply(func=self.format_row, axis=1)
+        responses = [safe_json_loads(r, self.error_handling) for r in df[self.api_column_names.response]]
+        df = self.format_responses(df, responses)
         df = move_api_columns_to_end(df, self.api_column_names, self.error_handling)
         logging.info("Formatting API results: Done.")
         return df
@@ -110,49 +128,31 @@ class SentimentAnalysisAPIFormatter(GenericAPIFormatter):
             self.sentiment_magnitude_column
         ] = "Magnitude score indicating emotion strength (both positive and negative) between 0 and +Inf"
 
-    def _scale_sentiment_score(self, score: float, sentiment_scale: AnyStr = "ternary") -> Union[AnyStr, float]:
-        if sentiment_scale == "binary":
-            return "negative" if score < 0 else "positive"
-        elif sentiment_scale == "ternary":
-            if score < -0.33:
-                return "negative"
-            elif score > 0.33:
-                return "positive"
-            else:
-                return "neutral"
-        elif sentiment_scale == "quinary":
-            if score < -0.66:
-                return "highly negative"
-            elif score < -0.33:
-                return "negative"
-            elif score < 0.33:
-                return "neutral"
-            elif score < 0.66:
-                return "positive"
-            else:
-                return "highly positive"
+    def _scale_sentiment_scores(self, scores: np.ndarray, sentiment_scale: AnyStr = "ternary") -> np.ndarray:
+        if sentiment_scale in SENTIMENT_SCALE_THRESHOLDS:
+            thresholds, labels = SENTIMENT_SCALE_THRESHOLDS[sentiment_scale]
+            label_indices = np.searchsorted(thresholds, scores, side="right")
+            return np.where(np.isnan(scores), None, np.array(labels, dtype=object)[label_indices])
         elif sentiment_scale == "rescale_zero_to_one":
-            return float((score + 1.0) / 2)
-        else:
-            return float(score)
-
-    def format_row(self, row: Dict) -> Dict:
-        raw_response = row[self.api_column_names.response]
-        response = safe_json_loads(raw_response, self.error_handling)
-        sentiment = response.get("documentSentiment", {})
-        sentiment_score = sentiment.get("score")
-        magnitude_score = sentiment.get("magnitude")
-        if sentiment_score is not None:
-            row[self.sentiment_score_column] = float(sentiment_score)
-            row[self.sentiment_score_scaled_column] = self._scale_sentiment_score(sentiment_score, self.sentiment_scale)
+            return (scores + 1.0) / 2
         else:
-            row[self.sentiment_score_column] = None
-            row[self.sentiment_score_scaled_column] = None
-        if magnitude_score is not None:
-            row[self.sentiment_magnitude_column] = float(magnitude_score)
+            return scores
+
+    def format_responses(self, df: pd.DataFrame, responses: List[Dict]) -> pd.DataFrame:
+        sentiments = [response.get("documentSentiment", {}) for response in responses]
+        # Scale from the parsed double-precision scores so that thresholds apply to the exact API values
+        sentiment_scores = np.array([sentiment.get("score") for sentiment in sentiments], dtype=np.float64)
+        magnitude_scores = np.array([sentiment.get("magnitude") for sentiment in sentiments], dtype=np.float64)
+        df[self.sentiment_score_column] = pd.Series(sentiment_scores, index=df.index, dtype=SENTIMENT_SCORE_DTYPE)
+        scaled_scores = self._scale_sentiment_scores(sentiment_scores, self.sentiment_scale)
+        if self.sentiment_scale in SENTIMENT_SCALE_THRESHOLDS:
+            df[self.sentiment_score_scaled_column] = pd.Series(scaled_scores, index=df.index, dtype=object)
         else:
-            row[self.sentiment_magnitude_column] = None
-        return row
+            df[self.sentiment_score_scaled_column] = pd.Series(
+                scaled_scores, index=df.index, dtype=SENTIMENT_SCORE_DTYPE
+            )
+        df[self.sentiment_magnitude_column] = pd.Series(magnitude_scores, index=df.index, dtype=SENTIMENT_SCORE_DTYPE)
+        return df
 
 
 class NamedEntityRecognitionAPIFormatter(GenericAPIFormatter):
@@ -174,30 +174,32 @@ class NamedEntityRecognitionAPIFormatter(GenericAPIFormatter):
         super().__init__(input_df, column_prefix, error_handling)
         self.entity_types = entity_types
         self.minimum_score = float(minimum_score)
+        self.entity_type_columns = {
+            n: generate_unique("entity_type_" + n.lower(), input_df.keys(), self.column_prefix)
+            for n in EntityTypeEnum.__members__
+        }
         self._compute_column_description()
 
     def _compute_column_description(self):
         for n, m in EntityTypeEnum.__members__.items():
-            entity_type_column = generate_unique("entity_type_" + n.lower(), self.input_df.keys(), self.column_prefix)
-            self.column_description_dict[entity_type_column] = "List of '{}' entities recognized by the API".format(
-                str(m.value)
-            )
+            self.column_description_dict[
+                self.entity_type_columns[n]
+            ] = "List of '{}' entities recognized by the API".format(str(m.value))
 
-    def format_row(self, row: Dict) -> Dict:
-        raw_response = row[self.api_column_names.response]
-        response = safe_json_loads(raw_response, self.error_handling)
-        entities = response.get("entities", [])
+    def format_responses(self, df: pd.DataFrame, responses: List[Dict]) -> pd.DataFrame:
         selected_entity_types = sorted([e.name for e in self.entity_types])
+        entity_names_by_type = {n: [] for n in selected_entity_types}
+        for response in responses:
+            row_entity_names = {n: [] for n in selected_entity_types}
+            for e in response.get("entities", []):
+                names = row_entity_names.get(e.get("type", ""))
+                if names is not None and float(e.get("salience", 0)) >= self.minimum_score:
+                    names.append(e.get("name"))
+            for n, names in row_entity_names.items():
+                entity_names_by_type[n].append(names if len(names) != 0 else "")
         for n in selected_entity_types:
-            entity_type_column = generate_unique("entity_type_" + n.lower(), row.keys(), self.column_prefix)
-            row[entity_type_column] = [
-                e.get("name")
-                for e in entities
-                if e.get("type", "") == n and float(e.get("salience", 0)) >= self.minimum_score
-            ]
-            if len(row[entity_type_column]) == 0:
-                row[entity_type_column] = ""
-        return row
+            df[self.entity_type_columns[n]] = pd.Series(entity_names_by_type[n], index=df.index, dtype=object)
+        return df
 
 
 class TextClassificationAPIFormatter(GenericAPIFormatter):
@@ -217,36 +219,39 @@ class TextClassificationAPIFormatter(GenericAPIFormatter):
     ):
         super().__init__(input_df, column_prefix, error_handling)
         self.num_categories = num_categories
+        self.category_columns = [
+            generate_unique("category_" + str(n + 1) + "_name", input_df.keys(), self.column_prefix)
+            for n in range(num_categories)
+        ]
+        self.confidence_columns = [
+            generate_unique("category_" + str(n + 1) + "_confidence", input_df.keys(), self.column_prefix)
+            for n in range(num_categories)
+        ]
         self._compute_column_description()
 
     def _compute_column_description(self):
         for n in range(self.num_categories):
-            category_column = generate_unique(
-                "category_" + str(n + 1) + "_name", self.input_df.keys(), self.column_prefix,
-            )
-            confidence_column = generate_unique(
-                "category_" + str(n + 1) + "_confidence", self.input_df.keys(), self.column_prefix,
-            )
-            self.column_description_dict[category_column] = "Name of the category {} representing the document".format(
-                str(n + 1)
-            )
-            self.column_description_dict[confidence_column] = "Classifier's confidence in the category {}".format(
-                str(n + 1)
-            )
+            self.column_description_dict[
+                self.category_columns[n]
+            ] = "Name of the category {} representing the document".format(str(n + 1))
+            self.column_description_dict[
+                self.confidence_columns[n]
+            ] = "Classifier's confidence in the category {}".format(str(n + 1))
 
-    def format_row(self, row: Dict) -> Dict:
-        raw_response = row[self.api_column_names.response]
-        response = safe_json_loads(raw_response, self.error_handling)
-        categories = sorted(response.get("categories", []), key=lambda x: x.get("confidence"), reverse=True,)
+    def format_responses(self, df: pd.DataFrame, responses: List[Dict]) -> pd.DataFrame:
+        categories_list = [
+            sorted(response.get("categories", []), key=lambda x: x.get("confidence"), reverse=True)
+            for response in responses
+        ]
         for n in range(self.num_categories):
-            category_column = generate_unique("category_" + str(n + 1) + "_name", row.keys(), self.column_prefix)
-            confidence_column = generate_unique(
-                "category_" + str(n + 1) + "_confidence", row.keys(), self.column_prefix
+            df[self.category_columns[n]] = pd.Series(
+                [categories[n].get("name", "") if len(categories) > n else "" for categories in categories_list],
+                index=df.index,
+                dtype=object,
             )
-            if len(categories) > n:
-                row[category_column] = categories[n].get("name", "")
-                row[confidence_column] = categories[n].get("confidence")
-            else:
-                row[category_column] = ""
-                row[confidence_column] = None
-        return row
+            df[self.confidence_columns[n]] = pd.Series(
+                [categories[n].get("confidence") if len(categories) > n else None for categories in categories_list],
+                index=df.index,
+                dtype=float,
+            )
+        return df
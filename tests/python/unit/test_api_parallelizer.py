@@ -7,7 +7,9 @@ import json
 from typing import AnyStr, Dict
 from enum import Enum
 
+import numpy as np
 import pandas as pd
+import pytest
 from google.api_core.exceptions import GoogleAPICallError
 
 from api_parallelizer import api_parallelizer  # noqa
@@ -95,3 +97,57 @@ def test_invalid_input():
     expected_dictionary = APICaseEnum.INVALID_INPUT.value
     for k in expected_dictionary:
         assert output_dictionary[k] == expected_dictionary[k]
+
+
+def test_deduplicate_input():
+    api_calls = []
+
+    def call_mock_api_with_counter(row: Dict) -> AnyStr:
+        api_calls.append(row)
+        return call_mock_api(row)
+
+    test_cases = [APICaseEnum.SUCCESS, APICaseEnum.API_FAILURE, APICaseEnum.SUCCESS, APICaseEnum.SUCCESS]
+    missing_values = [None, np.nan, None, np.nan]
+    input_df = pd.DataFrame(
+        {INPUT_COLUMN: test_cases + missing_values, "row_id": list(range(8))}, index=list(range(10, 18))
+    )
+    df = api_parallelizer(
+        input_df=input_df,
+        api_call_function=call_mock_api_with_counter,
+        api_exceptions=API_EXCEPTIONS,
+        column_prefix=COLUMN_PREFIX,
+        deduplicate_columns=[INPUT_COLUMN],
+    )
+    assert len(api_calls) == 3
+    assert list(df.index) == list(input_df.index)
+    assert list(df["row_id"]) == list(range(8))
+    assert list(df["test_api_response"][len(test_cases) :]) == ["{}"] * len(missing_values)
+    for i, test_case in enumerate(test_cases):
+        output_dictionary = df.iloc[i, :].to_dict()
+        expected_dictionary = test_case.value
+        for k in expected_dictionary:
+            assert output_dictionary[k] == expected_dictionary[k]
+
+
+def test_output_order():
+    test_cases = [APICaseEnum.API_FAILURE, APICaseEnum.SUCCESS] * 10
+    input_df = pd.DataFrame({INPUT_COLUMN: test_cases})
+    df = api_parallelizer(
+        input_df=input_df, api_call_function=call_mock_api, api_exceptions=API_EXCEPTIONS, column_prefix=COLUMN_PREFIX
+    )
+    assert list(df[INPUT_COLUMN]) == test_cases
+    assert list(df["test_api_response"]) == [c.value["test_api_response"] for c in test_cases]
+
+
+def test_missing_row_parameter():
+    def call_mock_api_without_row(text: AnyStr) -> AnyStr:
+        return text
+
+    input_df = pd.DataFrame({INPUT_COLUMN: [APICaseEnum.SUCCESS]})
+    with pytest.raises(ValueError):
+        api_parallelizer(
+            input_df=input_df,
+            api_call_function=call_mock_api_without_row,
+            api_exceptions=API_EXCEPTIONS,
+            column_prefix=COLUMN_PREFIX,
+        )
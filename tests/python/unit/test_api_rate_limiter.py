@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# This is a test file intended to be used with pytest
+# pytest automatically runs all the function starting with "test_"
+# see https://docs.pytest.org for more information
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api_rate_limiter import TokenBucketRateLimiter  # noqa
+
+
+# ==============================================================================
+# CONSTANT DEFINITION
+# ==============================================================================
+
+RATE_LIMIT_CALLS = 50
+RATE_LIMIT_PERIOD = 1
+NUM_CALLS = 11
+
+
+# ==============================================================================
+# CLASS AND FUNCTION DEFINITION
+# ==============================================================================
+
+
+def test_rate_limit_across_threads():
+    rate_limiter = TokenBucketRateLimiter(calls=RATE_LIMIT_CALLS, period=RATE_LIMIT_PERIOD)
+
+    @rate_limiter.limit
+    def call_mock_api(i: int) -> int:
+        return i
+
+    start_time = time.monotonic()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(call_mock_api, range(NUM_CALLS)))
+    elapsed_time = time.monotonic() - start_time
+    assert results == list(range(NUM_CALLS))
+    # The first call is immediate, then one call every period / calls
+    assert elapsed_time >= (NUM_CALLS - 1) * RATE_LIMIT_PERIOD / RATE_LIMIT_CALLS * 0.95
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# This is a test file intended to be used with pytest
+# pytest automatically runs all the function starting with "test_"
+# see https://docs.pytest.org for more information
+
+import os
+import sqlite3
+
+import pytest
+
+from api_response_cache import APIResponseCache, CACHE_FILE_NAME  # noqa
+
+
+# ==============================================================================
+# CLASS AND FUNCTION DEFINITION
+# ==============================================================================
+
+
+class MockAPI:
+    def __init__(self):
+        self.num_calls = 0
+
+    def call(self) -> str:
+        self.num_calls += 1
+        return '{"result": "Great success"}'
+
+
+def test_cache_hit(tmp_path):
+    mock_api = MockAPI()
+    api_cache = APIResponseCache(str(tmp_path))
+    key = api_cache.compute_key("analyze_sentiment", "en", "Great success")
+    for _ in range(3):
+        assert api_cache.get_or_compute(key, mock_api.call) == '{"result": "Great success"}'
+    assert mock_api.num_calls == 1
+    assert APIResponseCache(str(tmp_path)).get(key) == '{"result": "Great success"}'
+
+
+def test_cache_disabled():
+    mock_api = MockAPI()
+    api_cache = APIResponseCache()
+    key = api_cache.compute_key("analyze_sentiment", "en", "Great success")
+    for _ in range(3):
+        api_cache.get_or_compute(key, mock_api.call)
+    assert mock_api.num_calls == 3
+
+
+def test_cache_eviction(tmp_path):
+    api_cache = APIResponseCache(str(tmp_path), max_entries=2)
+    keys = [api_cache.compute_key("analyze_sentiment", "en", text) for text in ["a", "b", "c"]]
+    api_cache.set(keys[0], "a")
+    api_cache.set(keys[1], "b")
+    api_cache.get(keys[0])
+    api_cache.set(keys[2], "c")
+    reloaded_cache = APIResponseCache(str(tmp_path), max_entries=2)
+    assert reloaded_cache.get(keys[0]) == "a"
+    assert reloaded_cache.get(keys[1]) is None
+    assert reloaded_cache.get(keys[2]) == "c"
+
+
+def test_cache_error_is_miss(tmp_path):
+    mock_api = MockAPI()
+    api_cache = APIResponseCache(str(tmp_path))
+    with sqlite3.connect(os.path.join(str(tmp_path), CACHE_FILE_NAME)) as connection:
+        connection.execute("DROP TABLE api_response")
+    key = api_cache.compute_key("analyze_sentiment", "en", "Great success")
+    for _ in range(2):
+        assert api_cache.get_or_compute(key, mock_api.call) == '{"result": "Great success"}'
+    assert mock_api.num_calls == 2
+
+
+def test_invalid_cache_dir(tmp_path):
+    cache_dir = tmp_path / "not_a_directory"
+    cache_dir.write_text("")
+    with pytest.raises(ValueError):
+        APIResponseCache(str(cache_dir))
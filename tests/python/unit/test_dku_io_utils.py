@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# This is a test file intended to be used with pytest
+# pytest automatically runs all the function starting with "test_"
+# see https://docs.pytest.org for more information
+
+import sys
+import types
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+try:
+    import dataiku  # noqa
+except ImportError:  # The dataiku package is only available inside DSS, and only used for type hints here
+    sys.modules["dataiku"] = types.ModuleType("dataiku")
+    sys.modules["dataiku"].Dataset = object
+
+from dku_io_utils import process_dataset_chunks  # noqa
+
+
+# ==============================================================================
+# CONSTANT DEFINITION
+# ==============================================================================
+
+INPUT_SCHEMA = [
+    {"name": "text", "type": "string", "comment": "Input text"},
+    {"name": "count", "type": "bigint"},
+    {"name": "flag", "type": "boolean"},
+]
+
+# Chunks as pandas would infer them: integers become floats and booleans become objects in chunks with missing values
+INPUT_CHUNKS = [
+    pd.DataFrame({"text": ["a", "b"], "count": [1, 2], "flag": [True, False]}),
+    pd.DataFrame({"text": ["c", None], "count": [12.0, np.nan], "flag": [True, np.nan]}),
+    pd.DataFrame({"text": ["d"], "count": [4], "flag": [False]}),
+]
+
+
+# ==============================================================================
+# CLASS AND FUNCTION DEFINITION
+# ==============================================================================
+
+
+class MockInputDataset:
+    def __init__(self, schema: List[Dict], chunks: List[pd.DataFrame]):
+        self.schema = schema
+        self.chunks = chunks
+
+    def read_schema(self) -> List[Dict]:
+        return self.schema
+
+    def iter_dataframes(self, chunksize: int, infer_with_pandas: bool = True):
+        assert infer_with_pandas
+        for chunk in self.chunks:
+            yield chunk.copy()
+
+
+class MockWriter:
+    def __init__(self):
+        self.written_dfs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def write_dataframe(self, df: pd.DataFrame) -> None:
+        self.written_dfs.append(df)
+
+
+class MockOutputDataset:
+    def __init__(self):
+        self.schema = None
+        self.writer = MockWriter()
+
+    def write_schema_from_dataframe(self, df: pd.DataFrame) -> None:
+        self.schema = [
+            {"name": col, "type": "double" if pd.api.types.is_float_dtype(df[col]) else "string"} for col in df.columns
+        ]
+
+    def read_schema(self) -> List[Dict]:
+        return self.schema
+
+    def write_schema(self, schema: List[Dict]) -> None:
+        self.schema = schema
+
+    def get_writer(self) -> MockWriter:
+        assert self.schema is not None, "Schema must be written before getting a writer"
+        return self.writer
+
+
+def add_api_columns(input_df: pd.DataFrame) -> pd.DataFrame:
+    input_df["api_response"] = input_df["text"].map(lambda t: "{}" if isinstance(t, str) else "")
+    input_df["api_score"] = pd.Series(0.5, index=input_df.index, dtype=np.float32)
+    return input_df
+
+
+def test_process_dataset_chunks():
+    output_dataset = MockOutputDataset()
+    process_dataset_chunks(
+        input_dataset=MockInputDataset(INPUT_SCHEMA, INPUT_CHUNKS), output_dataset=output_dataset, func=add_api_columns
+    )
+    assert output_dataset.schema == INPUT_SCHEMA + [
+        {"name": "api_response", "type": "string"},
+        {"name": "api_score", "type": "double"},
+    ]
+    written_dfs = output_dataset.writer.written_dfs
+    assert [list(df["text"]) for df in written_dfs] == [["a", "b"], ["c", None], ["d"]]
+    for df in written_dfs:
+        assert df["count"].dtype == "Int64"
+        assert df["flag"].dtype == "boolean"
+    assert list(written_dfs[1]["count"].astype(object).fillna(-1)) == [12, -1]
+
+
+def test_process_empty_dataset():
+    output_dataset = MockOutputDataset()
+    process_dataset_chunks(
+        input_dataset=MockInputDataset(INPUT_SCHEMA, []), output_dataset=output_dataset, func=add_api_columns
+    )
+    assert [col["name"] for col in output_dataset.schema] == ["text", "count", "flag", "api_response", "api_score"]
+    assert output_dataset.writer.written_dfs == []
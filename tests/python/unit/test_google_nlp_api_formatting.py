@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# This is a test file intended to be used with pytest
+# pytest automatically runs all the function starting with "test_"
+# see https://docs.pytest.org for more information
+
+import json
+
+import pandas as pd
+import pytest
+
+from google_nlp_api_formatting import (  # noqa
+    EntityTypeEnum,
+    SentimentAnalysisAPIFormatter,
+    NamedEntityRecognitionAPIFormatter,
+    TextClassificationAPIFormatter,
+)
+
+
+# ==============================================================================
+# CONSTANT DEFINITION
+# ==============================================================================
+
+INPUT_COLUMN = "text"
+
+SENTIMENT_RESPONSES = [
+    json.dumps({"documentSentiment": {"score": -0.8, "magnitude": 0.8}}),
+    json.dumps({"documentSentiment": {"score": 0.33, "magnitude": 0.0}}),
+    json.dumps({"documentSentiment": {"score": 0.5, "magnitude": 1.5}}),
+    "",
+]
+
+ENTITY_RESPONSES = [
+    json.dumps(
+        {
+            "entities": [
+                {"name": "Dataiku", "type": "ORGANIZATION", "salience": 0.6},
+                {"name": "Paris", "type": "LOCATION", "salience": 0.3},
+                {"name": "New York", "type": "LOCATION", "salience": 0.05},
+            ]
+        }
+    ),
+    json.dumps({"entities": []}),
+    "",
+]
+
+CLASSIFICATION_RESPONSES = [
+    json.dumps(
+        {
+            "categories": [
+                {"name": "/Science", "confidence": 0.6},
+                {"name": "/Computers & Electronics", "confidence": 0.9},
+            ]
+        }
+    ),
+    json.dumps({"categories": [{"name": "/News", "confidence": 0.7}]}),
+    "",
+]
+
+
+# ==============================================================================
+# CLASS AND FUNCTION DEFINITION
+# ==============================================================================
+
+
+def build_api_df(column_prefix: str, responses) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            INPUT_COLUMN: ["text_{}".format(i) for i in range(len(responses))],
+            column_prefix + "_response": responses,
+            column_prefix + "_error_message": "",
+            column_prefix + "_error_type": "",
+        }
+    )
+
+
+def test_format_sentiment_analysis():
+    api_formatter = SentimentAnalysisAPIFormatter(
+        input_df=pd.DataFrame(columns=[INPUT_COLUMN]), sentiment_scale="ternary", column_prefix="sentiment_api"
+    )
+    df = api_formatter.format_df(build_api_df("sentiment_api", SENTIMENT_RESPONSES))
+    assert list(df.columns[:4]) == [
+        INPUT_COLUMN,
+        "sentiment_api_score",
+        "sentiment_api_score_scaled",
+        "sentiment_api_magnitude",
+    ]
+    assert list(df["sentiment_api_score_scaled"][:3]) == ["negative", "neutral", "positive"]
+    assert df["sentiment_api_score_scaled"][3] is None
+    assert list(df["sentiment_api_magnitude"][:3]) == pytest.approx([0.8, 0.0, 1.5])
+    assert df["sentiment_api_score"].dtype == "float32"
+    assert pd.isna(df["sentiment_api_score"][3])
+
+
+def test_format_named_entity_recognition():
+    api_formatter = NamedEntityRecognitionAPIFormatter(
+        input_df=pd.DataFrame(columns=[INPUT_COLUMN]),
+        entity_types=[EntityTypeEnum.LOCATION, EntityTypeEnum.ORGANIZATION],
+        minimum_score=0.1,
+        column_prefix="entity_api",
+    )
+    df = api_formatter.format_df(build_api_df("entity_api", ENTITY_RESPONSES))
+    assert list(df.columns[:3]) == [
+        INPUT_COLUMN,
+        "entity_api_entity_type_location",
+        "entity_api_entity_type_organization",
+    ]
+    assert list(df["entity_api_entity_type_location"]) == [["Paris"], "", ""]
+    assert list(df["entity_api_entity_type_organization"]) == [["Dataiku"], "", ""]
+
+
+def test_format_text_classification():
+    api_formatter = TextClassificationAPIFormatter(
+        input_df=pd.DataFrame(columns=[INPUT_COLUMN]), num_categories=2, column_prefix="text_classif_api"
+    )
+    df = api_formatter.format_df(build_api_df("text_classif_api", CLASSIFICATION_RESPONSES))
+    assert list(df.columns[:5]) == [
+        INPUT_COLUMN,
+        "text_classif_api_category_1_name",
+        "text_classif_api_category_1_confidence",
+        "text_classif_api_category_2_name",
+        "text_classif_api_category_2_confidence",
+    ]
+    assert list(df["text_classif_api_category_1_name"]) == ["/Computers & Electronics", "/News", ""]
+    assert list(df["text_classif_api_category_2_name"]) == ["/Science", "", ""]
+    assert list(df["text_classif_api_category_1_confidence"][:2]) == [0.9, 0.7]